@@ -4,17 +4,243 @@ Family Relationship Chatbot
 A conversational chatbot that understands family relationships using PROLOG inference engine.
 """
 
+import atexit
 import difflib
+import functools
+import os
 import re
 import sys
+import tempfile
+from collections import OrderedDict
 from typing import List, Optional, Tuple
 
-from pyswip import Prolog
+from pyswip import Functor, Prolog, Query, Variable
+from pyswip.core import PL_discard_foreign_frame, PL_exception, PL_open_foreign_frame
+from pyswip.easy import getTerm
+from pyswip.prolog import PrologError
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # rapidfuzz is optional, fall back to difflib
+    process = None
+
+try:
+    import readline
+except ImportError:  # no line editing or history, e.g. on Windows
+    readline = None
+
+
+def compile_alternation(patterns: dict) -> Tuple[re.Pattern, dict]:
+    """Fuse a table of patterns into one regex with a named group per pattern.
+
+    Returns the compiled regex and a map from group name to the relation type
+    and the slice of match.groups() holding that pattern's names.
+    """
+    branches = []
+    slices = {}
+    index = 0
+    for rel_type, pattern_list in patterns.items():
+        for number, pattern in enumerate(pattern_list):
+            group = f"{rel_type}__{number}"
+            branches.append(f"(?P<{group}>{pattern})")
+            width = re.compile(pattern).groups
+            slices[group] = (rel_type, slice(index + 1, index + 1 + width))
+            index += 1 + width
+    return re.compile("|".join(branches)), slices
+
+
+# Statement patterns according to specifications, fused into a single regex
+STATEMENT_RE, STATEMENT_GROUPS = compile_alternation(
+    {
+        "sister": [r"(\w+) is (?:a|the) sister of (\w+)"],
+        "siblings": [r"(\w+) and (\w+) are siblings"],
+        "mother": [r"(\w+) is (?:a|the) mother of (\w+)"],
+        "grandmother": [r"(\w+) is (?:a|the) grandmother of (\w+)"],
+        "child": [r"(\w+) is (?:a|the) child of (\w+)"],
+        "daughter": [r"(\w+) is (?:a|the) daughter of (\w+)"],
+        "uncle": [r"(\w+) is (?:an|the) uncle of (\w+)"],
+        "brother": [r"(\w+) is (?:a|the) brother of (\w+)"],
+        "father": [r"(\w+) is (?:a|the) father of (\w+)"],
+        "parents_of": [r"(\w+) and (\w+) are the parents of (\w+)"],
+        "grandfather": [r"(\w+) is (?:a|the) grandfather of (\w+)"],
+        "son": [r"(\w+) is (?:a|the) son of (\w+)"],
+        "aunt": [r"(\w+) is (?:an|the) aunt of (\w+)"],
+        "children_of": [
+            r"(\w+) and (\w+) are children of (\w+)",
+            r"(\w+) (\w+) and (\w+) are children of (\w+)",
+        ],
+    }
+)
+
+# Question forms, matched against the whole lower-cased question
+IS_QUESTION_RE = re.compile(r"is (\w+) (?:a|an|the) (\w+) of (\w+) ?\?")
+ARE_PAIR_QUESTION_RE = re.compile(r"are (\w+) and (\w+) (\w+) ?\?")
+ARE_OF_QUESTION_RE = re.compile(r"are (.+?) (?:the )?(\w+) of (\w+) ?\?")
+WHO_QUESTION_RE = re.compile(r"who (?:is|are) the (\w+) of (\w+) ?\?")
+NAME_RE = re.compile(r"\w+")
+
+# Derived relations kept as ground facts, each rebuilt when next asked about
+# after the facts change
+MATERIALIZED_RELATIONS = (
+    "sibling",
+    "aunt",
+    "uncle",
+    "grandparent",
+    "grandmother",
+    "grandfather",
+    "relative",
+)
+
+# Relationship words understood in questions, used for spelling correction
+RELATION_WORDS = (
+    "father",
+    "mother",
+    "child",
+    "children",
+    "son",
+    "daughter",
+    "sibling",
+    "brother",
+    "sister",
+    "grandmother",
+    "grandfather",
+    "aunt",
+    "uncle",
+    "grandparent",
+    "relative",
+    "parent",
+)
+
+# Exact spellings (plurals included) mapped straight to the relationship
+RELATION_MAP = {word: word for word in RELATION_WORDS}
+RELATION_MAP.update(
+    {f"{word}s": word for word in RELATION_WORDS if not word.startswith("child")}
+)
+RELATION_MAP["children"] = "child"
+
+# Relations where rel(A, B) holds exactly when rel(B, A) does
+SYMMETRIC_RELATIONS = frozenset({"sibling", "relative"})
+
+
+# Most answers to earlier questions kept for reuse until a fact is learned
+RESPONSE_CACHE_SIZE = 256
+
+# Words that end the session; none is longer than four letters
+EXIT_COMMANDS = frozenset({"quit", "exit", "bye"})
+
+# Previously typed lines, recalled with the arrow keys between sessions
+HISTORY_FILE = os.path.expanduser("~/.family_chatbot_history")
+HISTORY_LENGTH = 1000
+
+# Farewell shown whether the user quits or presses Ctrl-C
+GOODBYE = "Goodbye! Thanks for using the Family Relationship Chatbot!"
+
+# Replies to yes/no questions, shared by every question form
+YES = "Yes!"
+NO = "No!"
+
+# Reply to a question the chatbot cannot make sense of
+UNKNOWN_QUESTION = "Unknown Question. Please try a different way of asking."
+
+# Welcome banner, written in one go when the chatbot starts
+BANNER = (
+    "\n".join(
+        [
+            r"""
+
+_________                                     __             ____ ___       
+\_   ___ \  ____   ____   ____   ____   _____/  |_          |    |   \______
+/    \  \/ /  _ \ /    \ /    \_/ __ \_/ ___\   __\  ______ |    |   /  ___/
+\     \___(  <_> )   |  \   |  \  ___/\  \___|  |   /_____/ |    |  /\___ \ 
+ \______  /\____/|___|  /___|  /\___  >\___  >__|           |______//____  >
+        \/            \/     \/     \/     \/                            \/
+           
+        """,
+            "=" * 60,
+            "Welcome to the Family Relationship Chatbot!",
+            "I can help you manage and query family relationships.",
+            "\nExamples of statements you can make:",
+            "- John is the parent of Mary",
+            "- Alice is female",
+            "- Bob is male",
+            "\nExamples of questions you can ask:",
+            "- Is John the parent of Mary?",
+            "- Are Alice and Bob siblings?",
+            "- Who are Mary's parents?",
+            "\nType 'quit' to exit.",
+            "=" * 60,
+        ]
+    )
+    + "\n"
+)
+
+
+@functools.lru_cache(maxsize=512)
+def correct_spelling(word: str) -> Optional[str]:
+    """Map a possibly misspelled relationship word to the relation it names.
+
+    Returns None for a word that is not close to any relationship, so that a
+    user's word never becomes a PROLOG predicate. Users repeat the same few
+    words, so the fuzzy match is cached per word.
+    """
+    # Correctly spelled words skip the fuzzy matching entirely
+    relation = RELATION_MAP.get(word)
+    if relation:
+        return relation
+
+    if process is not None:
+        match = process.extractOne(
+            word, RELATION_WORDS, scorer=fuzz.ratio, score_cutoff=70
+        )
+        check_spelling = [match[0]] if match else []
+    else:
+        check_spelling = difflib.get_close_matches(
+            word, RELATION_WORDS, n=1, cutoff=0.7
+        )
+    if check_spelling:
+        if check_spelling[0] == "children":
+            return "child"
+        return check_spelling[0]
+    else:
+        return None
 
 
 class FamilyChatbot:
     def __init__(self):
         """Initialize the chatbot with PROLOG engine and knowledge base."""
+        self.query_cache = {}
+        self.response_cache = OrderedDict()
+        # Materialized relations whose ground facts are out of date
+        self.stale = set(MATERIALIZED_RELATIONS)
+        self.functors = {}
+        self.pending_facts = []
+        self.fact_count = 0
+        # Statement type -> the method that learns it, looked up in add_fact
+        self.add_handlers = {
+            "mother": self.add_mother,
+            "father": self.add_father,
+            "child": self.add_child,
+            "daughter": self.add_daughter,
+            "son": self.add_son,
+            "sister": self.add_sister,
+            "brother": self.add_brother,
+            "siblings": self.add_siblings,
+            "grandmother": self.add_grandmother,
+            "grandfather": self.add_grandfather,
+            "uncle": self.add_uncle,
+            "aunt": self.add_aunt,
+            "parents_of": self.add_parents_of,
+            "children_of": self.add_children_of,
+        }
+        # First word of a question -> the forms it can take, tried in order
+        self.question_handlers = {
+            "is": [(IS_QUESTION_RE, self.ask_is)],
+            "are": [
+                (ARE_PAIR_QUESTION_RE, self.ask_are_pair),
+                (ARE_OF_QUESTION_RE, self.ask_are_of),
+            ],
+            "who": [(WHO_QUESTION_RE, self.ask_who)],
+        }
         try:
             self.prolog = Prolog()
             self.setup_knowledge_base()
@@ -22,87 +248,90 @@ class FamilyChatbot:
             print(f"Error initializing PROLOG: {e}")
             print("Trying alternative initialization...")
             # Try with explicit path
-            import os
-
             os.environ["SWI_HOME_DIR"] = r"C:\Program Files\swipl"
             self.prolog = Prolog()
             self.setup_knowledge_base()
 
     def setup_knowledge_base(self):
         """Set up the PROLOG knowledge base with family relationship rules."""
+        # Compile the rules loaded below in optimised mode
+        list(self.prolog.query("set_prolog_flag(optimise, true)"))
         try:
             # Load rules from the relationships.pl file
-            self.load_prolog_file("relationships.pl")
+            try:
+                self.load_compiled_file("relationships.pl")
+            except Exception:
+                self.load_prolog_file("relationships.pl")
             print("✓ Successfully loaded PROLOG rules from relationships.pl")
         except Exception as e:
             print(f"Warning: Could not load relationships.pl: {e}")
             print("Falling back to hardcoded rules...")
             self.load_hardcoded_rules()
+        self.warm_up()
+
+    def warm_up(self):
+        """Do the one-off work of the first queries before the user asks anything."""
+        # Autoloads maplist/2 and sets up tabling, as the first flush_facts would
+        list(self.prolog.query("maplist(assertz, []), abolish_all_tables"))
+        # Nothing is known yet, so this only fills in the empty derived relations
+        for rel in MATERIALIZED_RELATIONS:
+            self.derived(rel)
+
+    def load_compiled_file(self, filename):
+        """Load PROLOG rules through a quick load file, recompiling it if stale."""
+        compiled = os.path.splitext(filename)[0] + ".qlf"
+        stale = not os.path.exists(compiled) or (
+            os.path.getmtime(compiled) < os.path.getmtime(filename)
+        )
+        if stale:
+            # qcompile/1 loads the file while writing the .qlf next to it
+            path = filename.replace("\\", "/")
+            list(self.prolog.query(f"qcompile('{path}')"))
+        else:
+            self.prolog.consult(compiled)
 
     def load_prolog_file(self, filename):
         """Load PROLOG rules from a file."""
+        if not os.path.exists(filename):
+            raise Exception(f"PROLOG file '{filename}' not found")
+        try:
+            # consult/1 lets PROLOG's own reader load the whole file in one call
+            self.prolog.consult(filename.replace("\\", "/"))
+        except Exception:
+            self.assert_prolog_file(filename)
+
+    def assert_prolog_file(self, filename):
+        """Assert PROLOG rules from a file one line at a time."""
         try:
+            # Stream the lines, running directives and asserting rules in file
+            # order, as consult/1 would
             with open(filename, "r") as file:
-                content = file.read()
-
-            # Split into lines and filter out comments and empty lines
-            lines = [line.strip() for line in content.split("\n")]
-            rules = []
-
-            for line in lines:
-                # Skip empty lines, comments, and lines starting with /*
-                if (
-                    line
-                    and not line.startswith("/*")
-                    and not line.startswith("%")
-                    and not line.startswith("//")
-                ):
+                for line in file:
+                    line = line.strip()
+                    # Skip empty lines, comments, and lines starting with /*
+                    if not line or line.startswith(("/*", "%", "//")):
+                        continue
                     # Remove trailing comments
                     if "/*" in line:
                         line = line.split("/*")[0].strip()
-
-                    if line:
-                        rules.append(line)
-
-            # Handle dynamic predicates first (they need special treatment)
-            dynamic_predicates = []
-            regular_rules = []
-
-            for rule in rules:
-                if rule.startswith(":- dynamic"):
-                    dynamic_predicates.append(rule)
-                else:
-                    regular_rules.append(rule)
-
-            # Assert dynamic predicates using query to avoid syntax issues
-            for dynamic_rule in dynamic_predicates:
-                try:
-                    # Extract the predicate from :- dynamic pred/arity
-                    if ":- dynamic" in dynamic_rule:
-                        predicate_part = dynamic_rule.replace(":- dynamic", "").strip()
-                        # Remove trailing period if present
-                        if predicate_part.endswith("."):
-                            predicate_part = predicate_part[:-1]
-                        # Use query to execute the dynamic directive
-                        list(self.prolog.query(f"dynamic({predicate_part})"))
-                except Exception as e:
-                    print(
-                        f"Warning: Could not process dynamic predicate {dynamic_rule}: {e}"
-                    )
-
-            # Assert regular rules - clean them up first
-            for rule in regular_rules:
-                if rule:
-                    try:
-                        # Clean up the rule: remove extra whitespace and ensure proper formatting
-                        cleaned_rule = " ".join(rule.split())  # Normalize whitespace
-                        # Remove trailing period if present
-                        if cleaned_rule.endswith("."):
-                            cleaned_rule = cleaned_rule[:-1]
-
-                        self.prolog.assertz(cleaned_rule)
-                    except Exception as e:
-                        print(f"Warning: Could not assert rule '{rule}': {e}")
+                    # Remove trailing period if present
+                    if line.endswith("."):
+                        line = line[:-1]
+                    if not line:
+                        continue
+
+                    # Directives such as ":- dynamic parent/2" are run as goals,
+                    # dynamic and table being prefix operators in SWI-Prolog
+                    if line.startswith(":-"):
+                        try:
+                            list(self.prolog.query(line[2:].strip()))
+                        except Exception as e:
+                            print(f"Warning: Could not process directive {line}: {e}")
+                    else:
+                        try:
+                            self.prolog.assertz(line)
+                        except Exception as e:
+                            print(f"Warning: Could not assert rule '{line}': {e}")
 
         except FileNotFoundError:
             raise Exception(f"PROLOG file '{filename}' not found")
@@ -112,9 +341,12 @@ class FamilyChatbot:
     def load_hardcoded_rules(self):
         """Fallback to hardcoded rules if file loading fails."""
         # Define dynamic predicates
-        self.prolog.assertz(":- dynamic parent/2")
-        self.prolog.assertz(":- dynamic male/1")
-        self.prolog.assertz(":- dynamic female/1")
+        directives = [
+            ":- dynamic parent/2.",
+            ":- dynamic male/1.",
+            ":- dynamic female/1.",
+            ":- table ancestor/2, descendant/2, relative/2, sibling/2, grandparent/2.",
+        ]
 
         # Family relationship rules
         rules = [
@@ -126,570 +358,552 @@ class FamilyChatbot:
             "son(S,P) :- child(S,P), male(S)",
             "daughter(D,P) :- child(D,P), female(D)",
             # Siblings
-            "sibling(X,Y) :- parent(P,X), parent(P,Y), X \\= Y",
+            "sibling(X,Y) :- parent(P,Y), parent(P,X), X \\= Y",
             "brother(B,Sib) :- sibling(B,Sib), male(B)",
             "sister(S,Sib) :- sibling(S,Sib), female(S)",
             # Grandparents
-            "grandparent(GP,C) :- parent(GP,P), parent(P,C)",
+            "grandparent(GP,C) :- parent(P,C), parent(GP,P)",
             "grandfather(GF,C) :- grandparent(GF,C), male(GF)",
             "grandmother(GM,C) :- grandparent(GF,C), female(GM)",
             # Ancestors
             "ancestor(A,D) :- parent(A,D)",
-            "ancestor(A,D) :- parent(A,X), ancestor(X,D)",
+            "ancestor(A,D) :- parent(X,D), ancestor(A,X)",
+            "descendant(D,A) :- parent(A,D)",
+            "descendant(D,A) :- parent(A,X), descendant(D,X)",
             # Uncles and Aunts
             "uncle(U,N) :- parent(P,N), sibling(U,P), male(U)",
             "aunt(A,N) :- parent(P,N), sibling(A,P), female(A)",
             # Parents of
             "parents_of(P1,P2,C) :- parent(P1,C), parent(P2,C), P1 \\= P2",
+            # Relatives
+            "relative(R1,R2) :- ancestor(R1, R2); descendant(R1, R2); "
+            "((ancestor(R1, X), ancestor(R2, X)); "
+            "(descendant(R1, X), descendant(R2, X))), R1 \\= R2",
         ]
 
-        for rule in rules:
-            self.prolog.assertz(rule)
+        # Load everything with a single consult instead of one assertz per rule
+        source = "\n".join(directives + [f"{rule}." for rule in rules])
+        with tempfile.NamedTemporaryFile("w", suffix=".pl", delete=False) as file:
+            file.write(source)
+        try:
+            self.prolog.consult(file.name)
+        finally:
+            os.remove(file.name)
 
     def parse_statement(self, text: str) -> Optional[Tuple[str, List[str]]]:
-        """Parse statements to determine relationship type and extract names."""
-        text = text.lower().strip()
-
-        # Statement patterns according to specifications
-        patterns = {
-            "sister": [r"(\w+) is a sister of (\w+)", r"(\w+) is the sister of (\w+)"],
-            "siblings": [r"(\w+) and (\w+) are siblings"],
-            "mother": [r"(\w+) is the mother of (\w+)", r"(\w+) is a mother of (\w+)"],
-            "grandmother": [
-                r"(\w+) is a grandmother of (\w+)",
-                r"(\w+) is the grandmother of (\w+)",
-            ],
-            "child": [r"(\w+) is a child of (\w+)", r"(\w+) is the child of (\w+)"],
-            "daughter": [
-                r"(\w+) is a daughter of (\w+)",
-                r"(\w+) is the daughter of (\w+)",
-            ],
-            "uncle": [r"(\w+) is an uncle of (\w+)", r"(\w+) is the uncle of (\w+)"],
-            "brother": [
-                r"(\w+) is a brother of (\w+)",
-                r"(\w+) is the brother of (\w+)",
-            ],
-            "father": [r"(\w+) is the father of (\w+)", r"(\w+) is a father of (\w+)"],
-            "parents_of": [r"(\w+) and (\w+) are the parents of (\w+)"],
-            "grandfather": [
-                r"(\w+) is a grandfather of (\w+)",
-                r"(\w+) is the grandfather of (\w+)",
-            ],
-            "son": [r"(\w+) is a son of (\w+)", r"(\w+) is the son of (\w+)"],
-            "aunt": [r"(\w+) is an aunt of (\w+)", r"(\w+) is the aunt of (\w+)"],
-            "children_of": [
-                r"(\w+) and (\w+) are children of (\w+)",
-                r"(\w+) (\w+) and (\w+) are children of (\w+)",
-            ],
-        }
-
-        for rel_type, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text)
-                if match:
-                    names = [name.lower() for name in match.groups()]
-                    return (rel_type, names)
+        """Parse lower-cased statements to determine relationship type and names."""
+        # The pattern has to cover the whole statement, bar a closing full stop
+        match = STATEMENT_RE.fullmatch(text.rstrip("."))
+        if match:
+            rel_type, names = STATEMENT_GROUPS[match.lastgroup]
+            # names are already lower case; interned as they key the query cache
+            return (rel_type, list(map(sys.intern, match.groups()[names])))
 
         return None
 
-    def parse_question(self, text: str) -> Optional[Tuple[str, List[str]]]:
-        """Parse questions to determine query type and extract names."""
-        text = text.lower().strip()
-
-        # Question patterns according to specifications
-        patterns = {
-            "are_siblings": [r"are (\w+) and (\w+) siblings\?"],
-            "who_siblings": [r"who are the siblings of (\w+)\?"],
-            "is_sister": [
-                r"is (\w+) a sister of (\w+)\?",
-                r"is (\w+) the sister of (\w+)\?",
-            ],
-            "is_brother": [
-                r"is (\w+) a brother of (\w+)\?",
-                r"is (\w+) the brother of (\w+)\?",
-            ],
-            "is_mother": [r"is (\w+) the mother of (\w+)\?"],
-            "is_father": [r"is (\w+) the father of (\w+)\?"],
-            "are_parents": [r"are (\w+) and (\w+) the parents of (\w+)\?"],
-            "who_sisters": [r"who are the sisters of (\w+)\?"],
-            "who_brothers": [r"who are the brothers of (\w+)\?"],
-            "who_mother": [r"who is the mother of (\w+)\?"],
-            "who_father": [r"who is the father of (\w+)\?"],
-            "who_parents": [r"who are the parents of (\w+)\?"],
-            "is_grandmother": [
-                r"is (\w+) a grandmother of (\w+)\?",
-                r"is (\w+) the grandmother of (\w+)\?",
-            ],
-            "is_grandfather": [
-                r"is (\w+) a grandfather of (\w+)\?",
-                r"is (\w+) the grandfather of (\w+)\?",
-            ],
-            "is_daughter": [
-                r"is (\w+) a daughter of (\w+)\?",
-                r"is (\w+) the daughter of (\w+)\?",
-            ],
-            "is_son": [r"is (\w+) a son of (\w+)\?", r"is (\w+) the son of (\w+)\?"],
-            "who_daughters": [r"who are the daughters of (\w+)\?"],
-            "who_sons": [r"who are the sons of (\w+)\?"],
-            "is_child": [
-                r"is (\w+) a child of (\w+)\?",
-                r"is (\w+) the child of (\w+)\?",
-            ],
-            "who_children": [r"who are the children of (\w+)\?"],
-            "are_children": [
-                r"are (\w+) and (\w+) children of (\w+)\?",
-                r"are (\w+) (\w+) and (\w+) children of (\w+)\?",
-            ],
-            "is_aunt": [
-                r"is (\w+) an aunt of (\w+)\?",
-                r"is (\w+) the aunt of (\w+)\?",
-            ],
-            "is_uncle": [
-                r"is (\w+) an uncle of (\w+)\?",
-                r"is (\w+) the uncle of (\w+)\?",
-            ],
-            "are_relatives": [r"are (\w+) and (\w+) relatives\?"],
-        }
-
-        for query_type, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text)
-                if match:
-                    names = [name.lower() for name in match.groups()]
-                    return (query_type, names)
-
-        return None
+    def assert_fact(self, rel: str, *names: str):
+        """Queue rel(names...) for asserting and forget cached answers it may change."""
+        self.pending_facts.append((rel, names))
+        self.fact_count += 1
+        self.query_cache.clear()
+        self.response_cache.clear()
+        self.stale.update(MATERIALIZED_RELATIONS)
+
+    def flush_facts(self):
+        """Assert every queued fact in one query, before PROLOG is asked anything."""
+        if not self.pending_facts:
+            return
+        facts, self.pending_facts = self.pending_facts, []
+        frame = PL_open_foreign_frame()
+        try:
+            # Facts are built as terms, so names are never read as PROLOG syntax
+            terms = [self.functor(rel, len(names))(*names) for rel, names in facts]
+            # Tabled answers were computed from the old facts
+            goal = self.functor(",", 2)(
+                self.functor("maplist", 2)("assertz", terms), "abolish_all_tables"
+            )
+            query = Query(goal)
+            try:
+                if not self.next_solution(query):
+                    raise PrologError("PROLOG could not assert the new facts")
+            finally:
+                query.closeQuery()
+        except PrologError:
+            # Keep the facts queued rather than losing them
+            self.pending_facts[:0] = facts
+            raise
+        finally:
+            PL_discard_foreign_frame(frame)
+
+    def refresh_derived_facts(self, rel: str):
+        """Rebuild the ground facts of one materialized relation in one query."""
+        self.flush_facts()
+        list(
+            self.prolog.query(
+                f"retractall({rel}_cached(_, _)), "
+                f"forall({rel}(X, Y), assertz({rel}_cached(X, Y)))"
+            )
+        )
+        self.stale.discard(rel)
+
+    def derived(self, rel: str) -> str:
+        """Return the predicate to query for rel, preferring its materialized facts."""
+        if rel not in MATERIALIZED_RELATIONS:
+            return rel
+        # Only the relation asked about is rebuilt, not all of them
+        if rel in self.stale:
+            self.refresh_derived_facts(rel)
+        return f"{rel}_cached"
+
+    def functor(self, name: str, arity: int) -> Functor:
+        """Return the PROLOG functor name/arity, creating it only once."""
+        if (name, arity) not in self.functors:
+            self.functors[(name, arity)] = Functor(name, arity)
+        return self.functors[(name, arity)]
+
+    def next_solution(self, query: Query) -> bool:
+        """Step an open Query, raising the error PROLOG caught instead of failing."""
+        if query.nextSolution():
+            return True
+        # Query catches PROLOG exceptions and reports them as a plain failure
+        exception = PL_exception(query.qid)
+        if exception:
+            raise PrologError(f"PROLOG error: {getTerm(exception)}")
+        return False
+
+    def solve_goal(self, build_goal, first_only: bool = False) -> list:
+        """Run the goal build_goal(X) returns, collecting X for every solution.
+
+        build_goal is called inside the query's foreign frame, so it can make
+        the goal from functors. Plain strings are put as atoms by pyswip, so
+        names in the goal are never read as PROLOG syntax.
+        """
+        self.flush_facts()
+        frame = PL_open_foreign_frame()
+        try:
+            unknown = Variable()
+            goal = build_goal(unknown)
+            if first_only:
+                goal = self.functor("once", 1)(goal)
+            query = Query(goal)
+            try:
+                solutions = []
+                while self.next_solution(query):
+                    solutions.append(unknown.value)
+                    if first_only:
+                        break
+                return solutions
+            finally:
+                query.closeQuery()
+        finally:
+            PL_discard_foreign_frame(frame)
+
+    def solve(self, rel: str, args: list, first_only: bool = False) -> list:
+        """Call rel(args...) as a prebuilt term instead of parsing a goal string.
+
+        A None argument is left unbound and its value is collected for every
+        solution; goals without one collect True per solution.
+        """
+
+        def goal(unknown):
+            terms = [unknown if arg is None else arg for arg in args]
+            return self.functor(rel, len(args))(*terms)
+
+        solutions = self.solve_goal(goal, first_only)
+        if None in args:
+            return [str(value) for value in solutions]
+        return [True] * len(solutions)
+
+    def relation_holds(self, rel: str, *names: str) -> bool:
+        """Check whether rel(names...) is true."""
+        key = (rel, *names)
+        if key not in self.query_cache:
+            self.query_cache[key] = bool(self.solve(rel, list(names), True))
+        return self.query_cache[key]
+
+    def relation_answers(self, rel: str, name: str) -> list:
+        """Find every X for which rel(X, name) is true."""
+        key = (rel, None, name)
+        if key not in self.query_cache:
+            self.query_cache[key] = self.solve(rel, [None, name])
+        return self.query_cache[key]
 
     def submit_query(self, rel, names):
         person1, person2 = names
         if rel == "male" or rel == "female":
-            resp = self.prolog.query(f"{rel}({person1})")
+            return self.relation_holds(rel, person1)
         else:
-            resp = self.prolog.query(f"{rel}({person1}, {person2})")
-        return list(resp)
+            # Only statements check through here, and each one is about to change
+            # the facts, so the rule is cheaper than rebuilding its derived facts
+            return self.relation_holds(rel, person1, person2)
 
     def submit_assert(self, rel, names):
         person1, person2 = names
         try:
             if rel == "male" or rel == "female":
-                self.prolog.assertz(f"{rel}({person1})")
+                self.assert_fact(rel, person1)
             else:
-                self.prolog.assertz(f"{rel}({person1}, {person2})")
+                self.assert_fact(rel, person1, person2)
             return True
         except:
             return False
 
-    def check_contradiction(self, relation: str, names) -> list[str]:
-        contradictions = []
-
-        if len(names) == 2:
-            x, y = names
-            x = x.lower()
-            y = y.lower()
-        elif len(names) == 3:
-            x, y, z = names
-            x = x.lower()
-            y = y.lower()
-            z = z.lower()
-        else:
-            x, y, z, a = names
-            x = x.lower()
-            y = y.lower()
-            z = z.lower()
-            a = a.lower()
-
-        relation = relation.lower()
+    def check_contradiction(self, relation: str, names) -> bool:
+        x, y = names[:2]  # parsed from lower-cased text
 
         # Prevent self-relationships
         if x == y:
-            contradictions.append("self-relationship")
+            return True
+        # Every rule is built on learned facts, so nothing can clash with none
+        if not self.fact_count:
+            return False
+
+        # Every contradicting goal goes into one disjunction, so PROLOG stops at
+        # the first one that holds instead of being asked once per rule. The
+        # goals call the rules directly: each statement changes the facts, so
+        # going through derived() would rebuild whole relations for a point check.
+        # Each goal is (rel, args...), with None for an argument left unbound
+        goals = []
 
         # Check reverse of the same relationship
-        if relation == "parent" and list(self.prolog.query(f"parent({y}, {x})")):
-            contradictions.append("reverse parent already exists")
-        if (
-            relation == "parent" or relation == "father" or relation == "mother"
-        ) and len(list(self.prolog.query(f"parent(X, {y})"))) > 1:
-            contradictions.append("more than two parents")
-        if relation == "child" and list(self.prolog.query(f"child({y}, {x})")):
-            contradictions.append("reverse child already exists")
-        if relation == "father" and len(list(self.prolog.query(f"father(X,{y})"))) > 0:
-            contradictions.append("can only have one father")
-        if relation == "mother" and len(list(self.prolog.query(f"mother(X,{y})"))) > 0:
-            contradictions.append("can only have one mother")
+        if relation == "parent":
+            goals.append(("parent", y, x))
+        if relation == "parent" or relation == "father" or relation == "mother":
+            # y already has two parents
+            goals.append(("parents_of", None, None, y))
+        if relation == "child":
+            goals.append(("child", y, x))
+        if relation == "father":
+            goals.append(("father", None, y))
+        if relation == "mother":
+            goals.append(("mother", None, y))
 
         # Specific contradictory relationship rules
         if relation in ["father", "mother"]:
-            # Cant also be child's child, sibling, or cousin
-            for rel in ["child", "sibling", "descendant"]:
-                if list(self.prolog.query(f"{rel}({x}, {y})")):
-                    contradictions.append(
-                        f"{x} cannot be both {relation} and {rel} of {y}"
-                    )
-            # Cant also be uncle/aunt
-            for rel in ["uncle", "aunt"]:
-                if list(self.prolog.query(f"{rel}({x}, {y})")):
-                    contradictions.append(
-                        f"{x} cannot be both {relation} and {rel} of {y}"
-                    )
+            # Cant also be child's child, sibling, or cousin, or uncle/aunt
+            for rel in ["child", "sibling", "descendant", "uncle", "aunt"]:
+                goals.append((rel, x, y))
             # Cant be grandmother and grandfather at once
-            if relation == "father" and list(self.prolog.query(f"female({x})")):
-                contradictions.append("father cannot be female")
-            if relation == "mother" and list(self.prolog.query(f"male({x})")):
-                contradictions.append("mother cannot be male")
+            goals.append(("female" if relation == "father" else "male", x))
 
         if relation in ["uncle", "aunt"]:
             # Cant be a parent, grandparent, sibling, or cousin
             for rel in ["parent", "grandparent", "sibling"]:
-                if list(self.prolog.query(f"{rel}({x}, {y})")):
-                    contradictions.append(
-                        f"{x} cannot be both {relation} and {rel} of {y}"
-                    )
+                goals.append((rel, x, y))
 
         if relation in ["brother", "sister"]:
             # Cant be parent or child
             for rel in ["parent", "child"]:
-                if list(self.prolog.query(f"{rel}({x}, {y})")):
-                    contradictions.append(
-                        f"{x} cannot be both {relation} and {rel} of {y}"
-                    )
+                goals.append((rel, x, y))
 
         if relation in ["son", "daughter"]:
             # Cant be parent of the same person
-            if list(self.prolog.query(f"parent({x}, {y})")):
-                contradictions.append(f"{x} cannot be both child and parent of {y}")
+            goals.append(("parent", x, y))
             # Gendercheck
-            if relation == "son" and list(self.prolog.query(f"female({x})")):
-                contradictions.append("son cannot be female")
-            if relation == "daughter" and list(self.prolog.query(f"male({x})")):
-                contradictions.append("daughter cannot be male")
+            goals.append(("female" if relation == "son" else "male", x))
+
+        def disjunction(unknown):
+            terms = [
+                self.functor(rel, len(args))(
+                    *[Variable() if arg is None else arg for arg in args]
+                )
+                for rel, *args in goals
+            ]
+            goal = terms.pop()
+            for term in reversed(terms):
+                goal = self.functor(";", 2)(term, goal)
+            return goal
 
-        return bool(contradictions)
+        return bool(goals) and bool(self.solve_goal(disjunction, True))
 
     def add_fact(self, rel_type: str, names: List[str]) -> str:
         """Add a fact to the knowledge base."""
         try:
-            if rel_type == "mother":
-                mother, child = names
-                self.prolog.assertz(f"parent({mother}, {child})")
-                self.prolog.assertz(f"female({mother})")
-                return "OK! I learned something."
-
-            elif rel_type == "father":
-                father, child = names
-                self.prolog.assertz(f"parent({father}, {child})")
-                self.prolog.assertz(f"male({father})")
-                return "OK! I learned something."
-
-            elif rel_type == "child":
-                child, parent = names
-                self.prolog.assertz(f"parent({parent}, {child})")
-                return "OK! I learned something."
-
-            elif rel_type == "daughter":
-                daughter, parent = names
-                self.prolog.assertz(f"parent({parent}, {daughter})")
-                self.prolog.assertz(f"female({daughter})")
-                return "OK! I learned something."
-
-            elif rel_type == "son":
-                son, parent = names
-                self.prolog.assertz(f"parent({parent}, {son})")
-                self.prolog.assertz(f"male({son})")
-                return "OK! I learned something."
-
-            elif rel_type == "sister":
-                sister, sibling = names
-                # Add parent relationship to make them siblings
-                # This is a simplified approach - in practice, you'd need to know their common parent
-                parents_1 = [
-                    res["X"] for res in list(self.prolog.query(f"parent(X, {sister})"))
-                ]
-                parents_2 = [
-                    res["X"] for res in list(self.prolog.query(f"parent(X, {sibling})"))
-                ]
-                common_parent = set(parents_1) & set(parents_2)
-                if common_parent:
-                    return "OK! I learned something."
-                elif len(parents_1) < 2 or len(parents_2) < 2:
-                    choice = input(
-                        "Can you provide us information about their common parent? [y/n]"
-                    )
-                    if choice.lower() == "y":
-                        common_name = input("Name of common parent: ")
-                        self.submit_assert("parent", [common_name.lower(), sister])
-                        self.submit_assert("parent", [common_name.lower(), sibling])
-                    else:
-                        return "Thats's impossible!"
-                self.prolog.assertz(f"female({sister})")
-                return "OK! I learned something."
-
-            elif rel_type == "brother":
-                brother, sibling = names
-                # Add parent relationship to make them siblings
-                # This is a simplified approach - in practice, you'd need to know their common parent
-                parents_1 = [
-                    res["X"] for res in list(self.prolog.query(f"parent(X, {brother})"))
-                ]
-                parents_2 = [
-                    res["X"] for res in list(self.prolog.query(f"parent(X, {sibling})"))
-                ]
-                common_parent = set(parents_1) & set(parents_2)
-                if common_parent:
-                    return "OK! I learned something."
-                elif len(parents_1) < 2 or len(parents_2) < 2:
-                    choice = input(
-                        "Can you provide us information about their common parent? [y/n]"
-                    )
-                    if choice.lower() == "y":
-                        common_name = input("Name of common parent: ")
-                        self.submit_assert("parent", [common_name.lower(), brother])
-                        self.submit_assert("parent", [common_name.lower(), sibling])
-                    else:
-                        return "That's impossible!"
-
-                self.prolog.assertz(f"male({brother})")
-                return "OK! I learned something."
-
-            elif rel_type == "siblings":
-                sibling1, sibling2 = names
-                # This is a simplified approach - in practice, you'd need to know their common parent
-                print("INSIDE")
-                parents_1 = [
-                    res["X"]
-                    for res in list(self.prolog.query(f"parent(X, {sibling1})"))
-                ]
-                parents_2 = [
-                    res["X"]
-                    for res in list(self.prolog.query(f"parent(X, {sibling2})"))
-                ]
-                common_parent = set(parents_1) & set(parents_2)
-                if common_parent:
-                    return "OK! I learned something."
-                elif len(parents_1) < 2 or len(parents_2) < 2:
-                    choice = input(
-                        "Can you provide us information about their common parent? [y/n]"
-                    )
-                    if choice.lower() == "y":
-                        common_name = input("Name of common parent: ")
-                        self.submit_assert("parent", [common_name.lower(), sibling1])
-                        self.submit_assert("parent", [common_name.lower(), sibling2])
-                        return "OK! I learned something."
+            return self.add_handlers[rel_type](names)
+        except EOFError:  # input ended while asking for a common parent
+            raise
+        except Exception as e:
+            return f"Error adding fact: {str(e)}"
 
+    def add_mother(self, names: List[str]) -> str:
+        """Learn that names[0] is the mother of names[1]."""
+        mother, child = names
+        self.assert_fact("parent", mother, child)
+        self.assert_fact("female", mother)
+        return "OK! I learned something."
+
+    def add_father(self, names: List[str]) -> str:
+        """Learn that names[0] is the father of names[1]."""
+        father, child = names
+        self.assert_fact("parent", father, child)
+        self.assert_fact("male", father)
+        return "OK! I learned something."
+
+    def add_child(self, names: List[str]) -> str:
+        """Learn that names[0] is a child of names[1]."""
+        child, parent = names
+        self.assert_fact("parent", parent, child)
+        return "OK! I learned something."
+
+    def add_daughter(self, names: List[str]) -> str:
+        """Learn that names[0] is a daughter of names[1]."""
+        daughter, parent = names
+        self.assert_fact("parent", parent, daughter)
+        self.assert_fact("female", daughter)
+        return "OK! I learned something."
+
+    def add_son(self, names: List[str]) -> str:
+        """Learn that names[0] is a son of names[1]."""
+        son, parent = names
+        self.assert_fact("parent", parent, son)
+        self.assert_fact("male", son)
+        return "OK! I learned something."
+
+    def add_sister(self, names: List[str]) -> str:
+        """Learn that names[0] is a sister of names[1]."""
+        sister, sibling = names
+        # Add parent relationship to make them siblings
+        # This is a simplified approach - in practice, you'd need to know their common parent
+        # sibling/2 is a shared parent, run as a term so names stay atoms
+        if self.relation_holds("sibling", sister, sibling):
+            return "OK! I learned something."
+        parents_1 = self.relation_answers("parent", sister)
+        parents_2 = self.relation_answers("parent", sibling)
+        if len(parents_1) < 2 or len(parents_2) < 2:
+            choice = input(
+                "Can you provide us information about their common parent? [y/n]"
+            )
+            if choice.lower() == "y":
+                common_name = input("Name of common parent: ").lower()
+                self.submit_assert("parent", [common_name, sister])
+                self.submit_assert("parent", [common_name, sibling])
+            else:
+                return "Thats's impossible!"
+        self.assert_fact("female", sister)
+        return "OK! I learned something."
+
+    def add_brother(self, names: List[str]) -> str:
+        """Learn that names[0] is a brother of names[1]."""
+        brother, sibling = names
+        # Add parent relationship to make them siblings
+        # This is a simplified approach - in practice, you'd need to know their common parent
+        # sibling/2 is a shared parent, run as a term so names stay atoms
+        if self.relation_holds("sibling", brother, sibling):
+            return "OK! I learned something."
+        parents_1 = self.relation_answers("parent", brother)
+        parents_2 = self.relation_answers("parent", sibling)
+        if len(parents_1) < 2 or len(parents_2) < 2:
+            choice = input(
+                "Can you provide us information about their common parent? [y/n]"
+            )
+            if choice.lower() == "y":
+                common_name = input("Name of common parent: ").lower()
+                self.submit_assert("parent", [common_name, brother])
+                self.submit_assert("parent", [common_name, sibling])
+            else:
                 return "That's impossible!"
 
-            elif rel_type == "grandmother":
-                if bool(self.submit_query("grandparent", names)):
-                    grandmother, grandchild = names
-                    self.prolog.assertz(f"female({grandmother})")
-                    return "OK! I learned something."
-                else:
-                    return "That's impossible!"
-
-            elif rel_type == "grandfather":
-                if bool(self.submit_query("grandparent", names)):
-                    grandfather, grandchild = names
-                    self.prolog.assertz(f"male({grandfather})")
-                    return "OK! I learned something."
-                else:
-                    return "That's impossible!"
-
-            elif rel_type == "uncle":
-                uncle, niece_nephew = names
-                if bool(self.submit_query("uncle", names)):
-                    self.prolog.assertz(f"male({uncle})")
-                    return "OK! I learned something."
-                else:
-                    return "That's impossible!"
-
-            elif rel_type == "aunt":
-                aunt, niece_nephew = names
-                if bool(self.submit_query("aunt", names)):
-                    self.prolog.assertz(f"female({uncle})")
-                    return "OK! I learned something."
-                else:
-                    return "That's impossible!"
-
-            elif rel_type == "parents_of":
-                parent1, parent2, child = names
-                self.prolog.assertz(f"parent({parent1}, {child})")
-                self.prolog.assertz(f"parent({parent2}, {child})")
+        self.assert_fact("male", brother)
+        return "OK! I learned something."
+
+    def add_siblings(self, names: List[str]) -> str:
+        """Learn that names[0] and names[1] are siblings."""
+        sibling1, sibling2 = names
+        # This is a simplified approach - in practice, you'd need to know their common parent
+        # sibling/2 is a shared parent, run as a term so names stay atoms
+        if self.relation_holds("sibling", sibling1, sibling2):
+            return "OK! I learned something."
+        parents_1 = self.relation_answers("parent", sibling1)
+        parents_2 = self.relation_answers("parent", sibling2)
+        if len(parents_1) < 2 or len(parents_2) < 2:
+            choice = input(
+                "Can you provide us information about their common parent? [y/n]"
+            )
+            if choice.lower() == "y":
+                common_name = input("Name of common parent: ").lower()
+                self.submit_assert("parent", [common_name, sibling1])
+                self.submit_assert("parent", [common_name, sibling2])
                 return "OK! I learned something."
 
-            elif rel_type == "children_of":
-                children = names[:-1]
-                parent = names[-1]
-                for child in children:
-                    self.prolog.assertz(f"parent({parent}, {child})")
-                return "OK! I learned something."
+        return "That's impossible!"
 
-        except Exception as e:
-            return f"Error adding fact: {str(e)}"
+    def add_grandmother(self, names: List[str]) -> str:
+        """Learn that names[0] is a grandmother of names[1]."""
+        if bool(self.submit_query("grandparent", names)):
+            grandmother, grandchild = names
+            self.assert_fact("female", grandmother)
+            return "OK! I learned something."
+        else:
+            return "That's impossible!"
+
+    def add_grandfather(self, names: List[str]) -> str:
+        """Learn that names[0] is a grandfather of names[1]."""
+        if bool(self.submit_query("grandparent", names)):
+            grandfather, grandchild = names
+            self.assert_fact("male", grandfather)
+            return "OK! I learned something."
+        else:
+            return "That's impossible!"
+
+    def add_uncle(self, names: List[str]) -> str:
+        """Learn that names[0] is an uncle of names[1]."""
+        uncle, niece_nephew = names
+        if bool(self.submit_query("uncle", names)):
+            self.assert_fact("male", uncle)
+            return "OK! I learned something."
+        else:
+            return "That's impossible!"
+
+    def add_aunt(self, names: List[str]) -> str:
+        """Learn that names[0] is an aunt of names[1]."""
+        aunt, niece_nephew = names
+        if bool(self.submit_query("aunt", names)):
+            self.assert_fact("female", aunt)
+            return "OK! I learned something."
+        else:
+            return "That's impossible!"
+
+    def add_parents_of(self, names: List[str]) -> str:
+        """Learn that names[0] and names[1] are the parents of names[2]."""
+        parent1, parent2, child = names
+        self.assert_fact("parent", parent1, child)
+        self.assert_fact("parent", parent2, child)
+        return "OK! I learned something."
+
+    def add_children_of(self, names: List[str]) -> str:
+        """Learn that all but the last name are children of the last one."""
+        children = names[:-1]
+        parent = names[-1]
+        for child in children:
+            self.assert_fact("parent", parent, child)
+        return "OK! I learned something."
 
     def yes_no_response(self, answer: bool):
         if answer:
-            return "Yes!"
+            return YES
         else:
-            return "No!"
+            return NO
+
+    def join_names(self, names: list) -> str:
+        """Join names into an English list, e.g. "A, B, and C"."""
+        if len(names) == 1:
+            return names[0]
+        elif len(names) == 2:
+            return " and ".join(names)
+
+        return ", ".join(names[:-1]) + ", and " + names[-1]
 
     def children_response(self, children: list, answer: bool):
         if answer and children:
-            return "Yes!"
+            return YES
         elif not answer and children:
-            if len(children) == 1:
-                children_str = children[0]
-            elif len(children) == 2:
-                children_str = " and ".join(children)
-            else:
-                children_str = ", ".join(children[:-1]) + ", and " + children[-1]
-
-            return f"Only {children_str}."
+            return f"Only {self.join_names(children)}."
         else:
-            return "No!"
-
-    def misspelled_words_for_query(self, word: str) -> str:
-        corrected_queries = [
-            "father",
-            "mother",
-            "child",
-            "children",
-            "son",
-            "daughter",
-            "sibling",
-            "brother",
-            "sister",
-            "grandmother",
-            "grandfather",
-            "aunt",
-            "uncle",
-            "grandparent",
-            "relative",
-            "parent",
-        ]
-        check_spelling = difflib.get_close_matches(
-            word, corrected_queries, n=1, cutoff=0.7
-        )
-        if check_spelling:
-            if check_spelling[0] == "children":
-                return "child"
-            return check_spelling[0]
-        else:
-            return word
-
-    def fix_duplicates(self, word: list) -> str:
-        results = set()  # remove duplicates
-        for answer in word:
-            name = answer["X"].capitalize()
-            results.add(name)
+            return NO
 
-        results = list(results)  # back to list so I can access them
+    def misspelled_words_for_query(self, word: str) -> Optional[str]:
+        return correct_spelling(word)
 
-        if len(results) == 1:
-            return "is", results[0]
-        elif len(results) == 2:
-            return "are", " and ".join(results)
+    def fix_duplicates(self, names: list) -> str:
+        # remove duplicates while keeping the order PROLOG found them in, then
+        # capitalize only the names that are left
+        results = [name.capitalize() for name in dict.fromkeys(names)]
 
-        return "are", ", ".join(results[:-1]) + ", and " + results[-1]
-
-    def fix_name(self, name: str) -> str:
-        character = name[-1]
-        if not character.isalpha():
-            name = name[:-1]  # remove punctuation character like ","
-        return name
+        verb = "is" if len(results) == 1 else "are"
+        return verb, self.join_names(results)
 
     def ask_question(self, question):
-        starting_questions = ["is", "are", "who"]
-        words = question.lower().split(" ")  # should query in all lower case
-        if words[0] == starting_questions[0]:  # Is questions -> Yes or No answers
-            relationship = self.misspelled_words_for_query(
-                words[3]
-            )  # accounts for misspelling queries for smooth conversation
-            if not relationship:
-                return 'Unknown "Is" Question. Please try a different way of asking.'
-            answer = bool(
-                list(self.prolog.query(f"{relationship}({words[1]}, {words[-1][:-1]})"))
-            )
+        # question is already lower case, as PROLOG atoms need
+        head = question.split(" ", 1)[0]
+        for pattern, handler in self.question_handlers.get(head, ()):
+            match = pattern.fullmatch(question)
+            if match:
+                return handler(*map(sys.intern, match.groups()))
+
+        return UNKNOWN_QUESTION
+
+    def ask_is(self, person1, word, person2):
+        """Is questions -> Yes or No answers"""
+        # accounts for misspelling queries for smooth conversation
+        relationship = self.misspelled_words_for_query(word)
+        if relationship is None:
+            return UNKNOWN_QUESTION
+        answer = self.relation_holds(self.derived(relationship), person1, person2)
+        return self.yes_no_response(answer)
+
+    def ask_are_pair(self, person1, person2, word):
+        """Are questions about siblings or relatives -> Yes or No answers"""
+        relationship = self.misspelled_words_for_query(word)
+        if relationship is None:
+            return UNKNOWN_QUESTION
+        answer = self.relation_holds(self.derived(relationship), person1, person2)
+        # Symmetric relations would give the same answer the other way round
+        if not answer and relationship not in SYMMETRIC_RELATIONS:
+            answer = self.relation_holds(self.derived(relationship), person2, person1)
+        return self.yes_no_response(answer)
+
+    def ask_are_of(self, names, word, parent):
+        """Are questions about parents or children -> Yes or No answers"""
+        names = [name for name in NAME_RE.findall(names) if name != "and"]
+        relationship = self.misspelled_words_for_query(word)
+
+        if relationship == "parent" and len(names) == 2:  # Questions "parents of"
+            answer = self.relation_holds("parents_of", names[0], names[1], parent)
             return self.yes_no_response(answer)
 
-        elif words[0] == starting_questions[1]:  # "Are" questions -> Yes or No answers
-            if words[4] == words[-1]:  # Questions "siblings" or "relatives"
-                relationship = self.misspelled_words_for_query(words[4][:-1])
-                answer = bool(
-                    list(self.prolog.query(f"{relationship}({words[1]}, {words[3]})"))
-                )
-                if not answer:  # try switching names
-                    answer = bool(
-                        list(
-                            self.prolog.query(f"{relationship}({words[3]}, {words[1]})")
-                        )
+        if relationship == "child":  # Questions "Children" -> 2 or more children
+            # One query lists the named people who are children of parent,
+            # which also tells whether all of them are
+            key = ("children", *names, parent)
+            if key not in self.query_cache:
+
+                def goal(child):
+                    # names go in as a list of atoms, never as PROLOG syntax
+                    return self.functor(",", 2)(
+                        self.functor("member", 2)(child, names),
+                        self.functor("once", 1)(
+                            self.functor("child", 2)(child, parent)
+                        ),
                     )
-                return self.yes_no_response(answer)
-
-            elif (
-                self.misspelled_words_for_query(words[5]) == "parent"
-            ):  # Questions "parents of"
-                answer = bool(
-                    list(
-                        self.prolog.query(
-                            f"parents_of({words[1]}, {words[3]}, {words[-1][:-1]})"
-                        )
-                    )
-                )
-                return self.yes_no_response(answer)
-
-            elif (
-                self.misspelled_words_for_query(words[-3]) == "child"
-                or words[-3] == "children"
-            ):  # Questions "Children" -> Can ask 2 or more children
-                relationship = self.misspelled_words_for_query(words[-3])
-                found_and = False  # boolean for checking the word "and"
-                all_children = (
-                    True  # boolean for checking if parent has this all children
-                )
-                list_of_children = []
-                parent = words[-1][:-1]
-                word_ctr = 1  # set to 1 since second word is the name
-
-                while not found_and:
-                    child_name = self.fix_name(words[word_ctr])
-                    if child_name == "and":
-                        found_and = True  # this means last checking of child
-                        child_name = self.fix_name(words[word_ctr + 1])
-
-                    answer = bool(
-                        list(self.prolog.query(f"child({child_name}, {parent})"))
-                    )
-                    if answer:
-                        list_of_children.append(child_name.capitalize())
-                    else:
-                        all_children = False  # automatic false if one is not
-                    word_ctr = word_ctr + 1  # next name
 
-                return self.children_response(list_of_children, all_children)
+                self.query_cache[key] = [str(c) for c in self.solve_goal(goal)]
+            list_of_children = [c.capitalize() for c in self.query_cache[key]]
+            all_children = len(list_of_children) == len(names)
 
-            else:
-                return 'Unknown "Are" Question. Please try a different way of asking.'
-
-        elif words[0] == starting_questions[2]:  # Who questions
-            relationship = self.misspelled_words_for_query(words[3])
-            if not relationship:
-                return 'Unknown "Who" Question. Please try a different way of asking.'
-            answer = list(self.prolog.query(f"{relationship}(X, {words[-1][:-1]})"))
-            if not answer:
-                return f"{words[-1][:-1].capitalize()} has no {words[3]}."
-            else:
-                verb, response = self.fix_duplicates(answer)
-                return f"The {words[3]} of {words[-1][:-1].capitalize()} {verb} {response}."
+            return self.children_response(list_of_children, all_children)
+
+        return 'Unknown "Are" Question. Please try a different way of asking.'
+
+    def ask_who(self, word, person):
+        """Who questions -> the names PROLOG finds"""
+        relationship = self.misspelled_words_for_query(word)
+        if relationship is None:
+            return UNKNOWN_QUESTION
+        answer = self.relation_answers(self.derived(relationship), person)
+        person = person.capitalize()
+        if not answer:
+            return f"{person} has no {word}."
+        else:
+            verb, response = self.fix_duplicates(answer)
+            return f"The {word} of {person} {verb} {response}."
+
+    def normalize(self, user_input: str) -> str:
+        """Lower-case user input and collapse runs of whitespace to one space."""
+        return " ".join(user_input.lower().split())
 
     def process_input(self, user_input: str) -> str:
         """Process user input and return appropriate response."""
+        return self.process_text(self.normalize(user_input))
+
+    def process_text(self, text: str) -> str:
+        """Respond to normalised input, so the parsers never lower-case it again."""
         # Check if it's a question (ends with ?)
-        if user_input.strip().endswith("?"):
-            return self.ask_question(user_input)
+        if text.endswith("?"):
+            return self.ask_question(text)
 
         # Check if it's a statement
         else:
-            parsed = self.parse_statement(user_input)
+            parsed = self.parse_statement(text)
             if parsed:
                 rel_type, names = parsed
                 if not self.check_contradiction(rel_type, names):
@@ -699,49 +913,74 @@ class FamilyChatbot:
             else:
                 return "I don't understand that statement format. Please try a different way of expressing the relationship."
 
+    def respond(self, user_input: str) -> str:
+        """Process user input, reusing the answer to a question asked before."""
+        # Normalised once per turn, for the cache key and the parsers alike
+        text = self.normalize(user_input)
+        if text in self.response_cache:
+            self.response_cache.move_to_end(text)
+            return self.response_cache[text]
+
+        response = self.process_text(text)
+        # Only questions are kept; learning a fact empties the cache again
+        if text.endswith("?"):
+            self.response_cache[text] = response
+            if len(self.response_cache) > RESPONSE_CACHE_SIZE:
+                self.response_cache.popitem(last=False)
+        return response
+
+    def load_history(self):
+        """Give input() line editing with history saved across sessions."""
+        if readline is None:
+            return
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:  # first run, nothing saved yet
+            pass
+        # Only the latest lines are written back, so the file stays small
+        readline.set_history_length(HISTORY_LENGTH)
+        atexit.register(self.save_history)
+
+    def save_history(self):
+        """Write the input history back, if the home directory allows it."""
+        try:
+            readline.write_history_file(HISTORY_FILE)
+        except OSError:  # e.g. a read-only home; losing history is harmless
+            pass
+
     def run(self):
         """Main chatbot loop."""
-        print(r"""
-
-_________                                     __             ____ ___       
-\_   ___ \  ____   ____   ____   ____   _____/  |_          |    |   \______
-/    \  \/ /  _ \ /    \ /    \_/ __ \_/ ___\   __\  ______ |    |   /  ___/
-\     \___(  <_> )   |  \   |  \  ___/\  \___|  |   /_____/ |    |  /\___ \ 
- \______  /\____/|___|  /___|  /\___  >\___  >__|           |______//____  >
-        \/            \/     \/     \/     \/                            \/
-           
-        """)
-        print("=" * 60)
-        print("Welcome to the Family Relationship Chatbot!")
-        print("I can help you manage and query family relationships.")
-        print("\nExamples of statements you can make:")
-        print("- John is the parent of Mary")
-        print("- Alice is female")
-        print("- Bob is male")
-        print("\nExamples of questions you can ask:")
-        print("- Is John the parent of Mary?")
-        print("- Are Alice and Bob siblings?")
-        print("- Who are Mary's parents?")
-        print("\nType 'quit' to exit.")
-        print("=" * 60)
+        # Piped input gets no banner or prompts, and skips input()'s flush per line
+        interactive = sys.stdin.isatty()
+        if interactive:
+            self.load_history()
+            sys.stdout.write(BANNER)
 
         while True:
             try:
-                user_input = input("\nYou: ").strip()
+                if interactive:
+                    user_input = input("\nYou: ").strip()
+                else:
+                    user_input = sys.stdin.readline()
+                    if not user_input:  # end of the piped input
+                        break
+                    user_input = user_input.strip()
 
-                if user_input.lower() in ["quit", "exit", "bye"]:
-                    print("Goodbye! Thanks for using the Family Relationship Chatbot!")
+                if len(user_input) <= 4 and user_input.lower() in EXIT_COMMANDS:
+                    print(GOODBYE)
                     break
 
                 if not user_input:
                     continue
 
-                response = self.process_input(user_input)
+                response = self.respond(user_input)
                 print(f"Chatbot: {response}")
 
-            except KeyboardInterrupt:
-                print("\n\nGoodbye! Thanks for using the Family Relationship Chatbot!")
+            # Ctrl-C, or Ctrl-D / the end of piped input while input() waits
+            except (KeyboardInterrupt, EOFError):
+                print("\n\n" + GOODBYE)
                 break
+            # Report anything else, such as a failed query, and keep chatting
             except Exception as e:
                 print(f"Chatbot: An error occurred: {str(e)}")
 
@@ -750,12 +989,13 @@ def main():
     """Main function to run the chatbot."""
     try:
         chatbot = FamilyChatbot()
-        chatbot.run()
     except Exception as e:
         print(f"Error initializing chatbot: {str(e)}")
         print("Make sure you have PROLOG installed and pyswip is properly configured.")
         sys.exit(1)
 
+    chatbot.run()
+
 
 if __name__ == "__main__":
     main()
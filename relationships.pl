@@ -2,6 +2,7 @@
 :- dynamic male/1.
 :- dynamic female/1.
 :- dynamic uncle/2.
+:- table ancestor/2, descendant/2, relative/2, sibling/2, grandparent/2.
 
 /* parents */
 father(F,C)        :- parent(F,C), male(F).
@@ -13,19 +14,19 @@ son(S,P)           :- child(S,P),   male(S).
 daughter(D,P)      :- child(D,P),   female(D).
 
 /* siblings pwede half */
-sibling(X,Y)       :- parent(P,X), parent(P,Y), X \= Y.
+sibling(X,Y)       :- parent(P,Y), parent(P,X), X \= Y.
 
 brother(B,Sib)     :- sibling(B,Sib), male(B).
 sister(S,Sib)      :- sibling(S,Sib), female(S).
 
 /* grand */
-grandparent(GP,C)  :- parent(GP,P), parent(P,C).
+grandparent(GP,C)  :- parent(P,C), parent(GP,P).
 grandfather(GF,C)  :- grandparent(GF,C), male(GF).
 grandmother(GM,C)  :- grandparent(GM,C), female(GM).
 
-/* relatives like ancestor or descendant */
+/* relatives like ancestor or descendant, each walking from its bound second argument */
 ancestor(A,D)      :- parent(A,D).
-ancestor(A,D)      :- parent(A,X), ancestor(X,D).
+ancestor(A,D)      :- parent(X,D), ancestor(A,X).
 descendant(D,A)    :- parent(A,D).
 descendant(D,A)    :- parent(A,X), descendant(D,X).
 